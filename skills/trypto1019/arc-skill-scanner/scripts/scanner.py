@@ -8,10 +8,31 @@ Detects credential stealers, data exfiltration, malicious URLs, and more.
 import argparse
 import hashlib
 import json
+import mmap
 import os
 import re
 import sys
+from array import array
+from bisect import bisect_right
 from pathlib import Path
+from typing import NamedTuple
+
+try:
+    import blake3  # optional: ~5x faster than SHA-256 for large binaries
+except ImportError:
+    blake3 = None
+
+try:
+    import orjson  # optional: C-level JSON encoder for large scan output
+except ImportError:
+    orjson = None
+
+try:
+    # optional: SIMD bit-parallel Levenshtein in C++, far faster than the
+    # pure-Python DP fallback below
+    from rapidfuzz.distance import Levenshtein as _Levenshtein
+except ImportError:
+    _Levenshtein = None
 
 # === Pattern Definitions ===
 
@@ -122,6 +143,16 @@ BINARY_EXTENSIONS = {
     ".tar", ".gz", ".zip", ".7z", ".rar", ".bz2", ".xz",
 }
 
+# Code files larger than this are skipped (minified bundles, generated code)
+MAX_SCAN_BYTES = 1_000_000
+
+# Findings emitted per pattern per file before truncating; generated files
+# can match the same pattern thousands of times with no extra signal
+MAX_HITS_PER_PATTERN = 50
+
+# Vendored/generated directories that are pure noise for the scanner
+SKIP_PATH_RX = re.compile(r"[\\/](node_modules|vendor|\.venv|dist|build)[\\/]")
+
 # Known popular skill names (for typosquatting detection)
 POPULAR_SKILLS = [
     "discord-helper", "memory-setup", "memory-hygiene", "budget-tracker",
@@ -130,103 +161,229 @@ POPULAR_SKILLS = [
     "browser-tool", "web-search", "code-review", "git-helper",
 ]
 
+# POPULAR_SKILLS bucketed by name length: |len(a)-len(b)| > 2 already implies
+# edit distance > 2, so only nearby length buckets ever need the DP
+_POPULAR_BY_LEN = {}
+for _name in POPULAR_SKILLS:
+    _POPULAR_BY_LEN.setdefault(len(_name), []).append(_name)
+
+
+class Finding(NamedTuple):
+    """A single scan finding.
+
+    Tuple-backed: far cheaper per instance than a 5-key dict when a scan
+    produces thousands of findings. Use _asdict() when serializing to JSON.
+    """
+    file: str
+    line: int
+    severity: str
+    description: str
+    match: str
+
+
+def _dumps(obj):
+    """Serialize to pretty-printed JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+# Finding description → severity, built once instead of three throwaway sets
+# per classify_severity call
+_CRITICAL = {"Dynamic code execution", "Serialized code loading", "Native code loading",
+             "Prompt injection: override instructions", "Prompt injection: role override",
+             "Fetches and executes remote code"}
+_HIGH = {"Shell command execution", "Shell=True in subprocess — RCE risk",
+         "Accesses SSH keys", "Accesses credential files",
+         "Accesses system keychain", "POSTs data externally", "Raw socket connection",
+         "Covert action instruction", "Information suppression instruction",
+         "Fetches remote instructions", "Downloads instructions dynamically",
+         "Periodic remote instruction fetch", "Dumps environment variables to stdout",
+         "Logs sensitive values", "Library injection via environment",
+         "Contains prebuilt binary — cannot verify source",
+         "Path traversal pattern (directory escape)",
+         "Path traversal via os.path.join"}
+_MEDIUM = {"Accesses sensitive API keys", "Reads sensitive env vars", "Base64 decoding",
+           "Shell POST request", "Email sending capability", "Dynamic module import",
+           "Compiled code execution", "Reads system files", "Deletes files",
+           "Changes file permissions", "Accesses home directory hidden files",
+           "Logs environment variables", "Logs configuration data",
+           "Debug-logs environment data", "Full traceback exposure (may leak paths/secrets)",
+           "Contains compiled code — cannot audit", "Makes file executable"}
+
+_SEVERITY_MAP = (
+    {d: "CRITICAL" for d in _CRITICAL}
+    | {d: "HIGH" for d in _HIGH}
+    | {d: "MEDIUM" for d in _MEDIUM}
+)
+
 
 def classify_severity(finding_type):
     """Classify a finding into a severity level."""
-    critical = {"Dynamic code execution", "Serialized code loading", "Native code loading",
-                "Prompt injection: override instructions", "Prompt injection: role override",
-                "Fetches and executes remote code"}
-    high = {"Shell command execution", "Shell=True in subprocess — RCE risk",
-            "Accesses SSH keys", "Accesses credential files",
-            "Accesses system keychain", "POSTs data externally", "Raw socket connection",
-            "Covert action instruction", "Information suppression instruction",
-            "Fetches remote instructions", "Downloads instructions dynamically",
-            "Periodic remote instruction fetch", "Dumps environment variables to stdout",
-            "Logs sensitive values", "Library injection via environment",
-            "Contains prebuilt binary — cannot verify source",
-            "Path traversal pattern (directory escape)",
-            "Path traversal via os.path.join"}
-    medium = {"Accesses sensitive API keys", "Reads sensitive env vars", "Base64 decoding",
-              "Shell POST request", "Email sending capability", "Dynamic module import",
-              "Compiled code execution", "Reads system files", "Deletes files",
-              "Changes file permissions", "Accesses home directory hidden files",
-              "Logs environment variables", "Logs configuration data",
-              "Debug-logs environment data", "Full traceback exposure (may leak paths/secrets)",
-              "Contains compiled code — cannot audit", "Makes file executable"}
-
-    if finding_type in critical:
-        return "CRITICAL"
-    elif finding_type in high:
-        return "HIGH"
-    elif finding_type in medium:
-        return "MEDIUM"
-    return "LOW"
+    return _SEVERITY_MAP.get(finding_type, "LOW")
+
+
+# Byte-mode compiled pattern sets, keyed by id() of the raw pattern list so
+# call sites keep passing the readable (pattern, description) tuples above.
+_COMPILED_PATTERNS = {}
+
+
+def _compile_patterns(patterns):
+    """Compile a (pattern, description) list to byte-mode regexes, cached.
+
+    Severity is resolved once at compile time and carried in the tuple so the
+    scan loop skips the per-match classify_severity lookup.
+    """
+    cached = _COMPILED_PATTERNS.get(id(patterns))
+    if cached is None:
+        # Patterns are ASCII; lowercasing them (and the buffer, once) gives
+        # the same matches as re.IGNORECASE without its case-folding tables
+        cached = [
+            (re.compile(p.lower().encode()), desc, classify_severity(desc))
+            for p, desc in patterns
+        ]
+        _COMPILED_PATTERNS[id(patterns)] = cached
+    return cached
+
+
+def _line_offsets(buf):
+    """Start offset of every line in the buffer, via one C-level scan.
+
+    Stored as a typed array rather than a list of Python ints: ~8 bytes per
+    line instead of ~36, and no per-line object allocation.
+    """
+    offsets = array("Q", (0,))
+    offsets.extend(m.end() for m in re.finditer(b"\n", buf))
+    return offsets
 
 
 def scan_content(content, filename, patterns):
-    """Scan content against a set of patterns."""
+    """Scan content (str, bytes, or mmap) against a set of patterns.
+
+    Each pattern runs over the whole buffer in one C-level pass; line numbers
+    are recovered from a precomputed newline-offset table with bisect instead
+    of iterating the file line by line in Python.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8", "surrogateescape")
+    compiled = _compile_patterns(patterns)
+    # One C-level lowercase pass; matching runs on it, display slices come
+    # from the original buffer
+    lowered = bytes(content).lower()
+    line_starts = _line_offsets(lowered)
+    buf_len = len(lowered)
     findings = []
-    for line_num, line in enumerate(content.split("\n"), 1):
-        for pattern, desc in patterns:
-            if re.search(pattern, line, re.IGNORECASE):
-                findings.append({
-                    "file": filename,
-                    "line": line_num,
-                    "severity": classify_severity(desc),
-                    "description": desc,
-                    "match": line.strip()[:120],
-                })
+    seen = set()
+    for pattern, desc, severity in compiled:
+        hits = 0
+        for m in pattern.finditer(lowered):
+            idx = bisect_right(line_starts, m.start())  # 1-based line number
+            if (idx, desc) in seen:
+                continue  # one finding per (line, pattern)
+            seen.add((idx, desc))
+            hits += 1
+            if hits > MAX_HITS_PER_PATTERN:
+                findings.append(Finding(
+                    file=filename,
+                    line=idx,
+                    severity="LOW",
+                    description=f"{desc} — further matches truncated",
+                    match="",
+                ))
+                break
+            line_start = line_starts[idx - 1]
+            line_end = line_starts[idx] - 1 if idx < len(line_starts) else buf_len
+            line = bytes(content[line_start:line_end])
+            findings.append(Finding(
+                file=filename,
+                line=idx,
+                severity=severity,
+                description=desc,
+                # Decode only the matched line for display
+                match=line.strip().decode("utf-8", "replace")[:120],
+            ))
     return findings
 
 
+def _open_buffer(path):
+    """Open a file as a read-only mmap (zero-copy), or bytes if it is empty."""
+    with open(path, "rb") as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file cannot be mmapped
+            return b""
+
+
 def scan_skill_md(path):
     """Scan a SKILL.md file for security issues."""
     if not os.path.exists(path):
         return []
 
-    with open(path) as f:
-        content = f.read()
-
+    buf = _open_buffer(path)
     findings = []
-    findings.extend(scan_content(content, "SKILL.md", SUSPICIOUS_URL_PATTERNS))
-    findings.extend(scan_content(content, "SKILL.md", INJECTION_PATTERNS))
-    findings.extend(scan_content(content, "SKILL.md", CREDENTIAL_PATTERNS))
+    findings.extend(scan_content(buf, "SKILL.md", SUSPICIOUS_URL_PATTERNS))
+    findings.extend(scan_content(buf, "SKILL.md", INJECTION_PATTERNS))
+    findings.extend(scan_content(buf, "SKILL.md", CREDENTIAL_PATTERNS))
 
     # Check for excessive metadata requirements
-    if "requires" in content:
-        env_matches = re.findall(r'"env"\s*:\s*\[([^\]]+)\]', content)
+    if buf.find(b"requires") != -1:
+        env_matches = re.findall(rb'"env"\s*:\s*\[([^\]]+)\]', buf)
         for match in env_matches:
-            keys = [k.strip().strip('"').strip("'") for k in match.split(",")]
+            keys = [k.strip().strip(b'"').strip(b"'") for k in match.split(b",")]
             if len(keys) > 5:
-                findings.append({
-                    "file": "SKILL.md",
-                    "line": 0,
-                    "severity": "MEDIUM",
-                    "description": f"Requests {len(keys)} env vars — excessive permissions",
-                    "match": match[:120],
-                })
-
+                findings.append(Finding(
+                    file="SKILL.md",
+                    line=0,
+                    severity="MEDIUM",
+                    description=f"Requests {len(keys)} env vars — excessive permissions",
+                    match=match.decode("utf-8", "replace")[:120],
+                ))
+
+    if isinstance(buf, mmap.mmap):
+        buf.close()
     return findings
 
 
+# All pattern sets applied to script/code files
+_SCRIPT_PATTERN_SETS = (
+    SUSPICIOUS_URL_PATTERNS,
+    CREDENTIAL_PATTERNS,
+    EXFIL_PATTERNS,
+    EXEC_PATTERNS,
+    OBFUSCATION_PATTERNS,
+    FS_PATTERNS,
+    CRYPTO_PATTERNS,
+    DYNAMIC_FETCH_PATTERNS,
+    TELEMETRY_PATTERNS,
+    BINARY_ASSET_PATTERNS,
+)
+
+# In-process scan results keyed by content digest: identical files copied
+# across skills (vendored helpers, license stubs) are scanned once per run
+_CONTENT_SCAN_CACHE = {}
+
+
 def scan_script(path):
     """Scan a script file for security issues."""
-    with open(path) as f:
-        content = f.read()
-
+    buf = _open_buffer(path)
     filename = os.path.basename(path)
+
+    digest = hashlib.blake2b(buf, digest_size=16).digest()
+    cached = _CONTENT_SCAN_CACHE.get(digest)
+    if cached is not None:
+        if isinstance(buf, mmap.mmap):
+            buf.close()
+        return [f._replace(file=filename) for f in cached]
+
     findings = []
-    findings.extend(scan_content(content, filename, SUSPICIOUS_URL_PATTERNS))
-    findings.extend(scan_content(content, filename, CREDENTIAL_PATTERNS))
-    findings.extend(scan_content(content, filename, EXFIL_PATTERNS))
-    findings.extend(scan_content(content, filename, EXEC_PATTERNS))
-    findings.extend(scan_content(content, filename, OBFUSCATION_PATTERNS))
-    findings.extend(scan_content(content, filename, FS_PATTERNS))
-    findings.extend(scan_content(content, filename, CRYPTO_PATTERNS))
-    findings.extend(scan_content(content, filename, DYNAMIC_FETCH_PATTERNS))
-    findings.extend(scan_content(content, filename, TELEMETRY_PATTERNS))
-    findings.extend(scan_content(content, filename, BINARY_ASSET_PATTERNS))
+    for patterns in _SCRIPT_PATTERN_SETS:
+        findings.extend(scan_content(buf, filename, patterns))
+
+    # Cache with the file field blanked; it is rebound per hit
+    _CONTENT_SCAN_CACHE[digest] = tuple(f._replace(file="") for f in findings)
 
+    if isinstance(buf, mmap.mmap):
+        buf.close()
     return findings
 
 
@@ -234,47 +391,118 @@ def check_typosquatting(skill_name):
     """Check if a skill name looks like a typosquat of a popular skill."""
     findings = []
     name_lower = skill_name.lower().strip()
+    length = len(name_lower)
+
+    # Only names within +/-2 characters can be within edit distance 2
+    candidates = [
+        p for k in range(length - 2, length + 3) for p in _POPULAR_BY_LEN.get(k, ())
+    ]
 
-    for popular in POPULAR_SKILLS:
+    for popular in candidates:
         if name_lower == popular:
             continue  # Exact match is fine
 
         # Check edit distance (Levenshtein distance of 1-2 is suspicious)
         dist = _edit_distance(name_lower, popular)
         if 1 <= dist <= 2:
-            findings.append({
-                "file": "skill-name",
-                "line": 0,
-                "severity": "HIGH",
-                "description": f"Possible typosquat of '{popular}' (edit distance: {dist})",
-                "match": f"Skill name '{skill_name}' is very similar to popular skill '{popular}'",
-            })
+            findings.append(Finding(
+                file="skill-name",
+                line=0,
+                severity="HIGH",
+                description=f"Possible typosquat of '{popular}' (edit distance: {dist})",
+                match=f"Skill name '{skill_name}' is very similar to popular skill '{popular}'",
+            ))
 
     return findings
 
 
-def _edit_distance(s1, s2):
-    """Compute Levenshtein edit distance between two strings."""
+def _edit_distance(s1, s2, cutoff=2):
+    """Compute Levenshtein edit distance between two strings.
+
+    Returns cutoff + 1 as soon as the distance provably exceeds cutoff, which
+    is all check_typosquatting needs.
+    """
+    if _Levenshtein is not None:
+        return _Levenshtein.distance(s1, s2, score_cutoff=cutoff)
+
     if len(s1) < len(s2):
-        return _edit_distance(s2, s1)
+        s1, s2 = s2, s1
     if len(s2) == 0:
-        return len(s1)
+        return len(s1) if len(s1) <= cutoff else cutoff + 1
 
-    prev_row = range(len(s2) + 1)
+    # Two reusable typed rows instead of a fresh list per outer iteration
+    n = len(s2)
+    prev = array("i", range(n + 1))
+    curr = array("i", bytes(4 * (n + 1)))
     for i, c1 in enumerate(s1):
-        curr_row = [i + 1]
+        curr[0] = i + 1
+        row_min = curr[0]
         for j, c2 in enumerate(s2):
-            insertions = prev_row[j + 1] + 1
-            deletions = curr_row[j] + 1
-            substitutions = prev_row[j] + (c1 != c2)
-            curr_row.append(min(insertions, deletions, substitutions))
-        prev_row = curr_row
+            v = min(prev[j + 1] + 1, curr[j] + 1, prev[j] + (c1 != c2))
+            curr[j + 1] = v
+            if v < row_min:
+                row_min = v
+        if row_min > cutoff:
+            return cutoff + 1
+        prev, curr = curr, prev
+
+    return prev[n]
 
-    return prev_row[-1]
+
+def _walk_files(root):
+    """Yield os.DirEntry objects for every non-directory entry under root.
+
+    scandir-based recursion: each entry carries cached type/stat info, so
+    callers avoid the extra stat/lstat syscalls that os.walk + Path incurs.
+    Symlinked directories are not followed; symlink entries themselves are
+    yielded so callers can flag them.
+    """
+    try:
+        entries = os.scandir(root)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_files(entry.path)
+            else:
+                yield entry
+
+
+def _ext_of(name):
+    """Lowercased extension of a filename (with dot), without building a Path."""
+    dot = name.rfind(".")
+    return name[dot:].lower() if dot > 0 else ""
+
+
+def _hash_file(fpath, algo=None):
+    """Hash a file with the given algorithm (default: blake3 if available, else sha256).
+
+    Returns (algo, hexdigest), or (algo, None) if the algorithm is unavailable.
+    """
+    if algo is None:
+        algo = "blake3" if blake3 is not None else "sha256"
+
+    if algo == "blake3":
+        if blake3 is None:
+            return algo, None
+        return algo, blake3.blake3(max_threads=blake3.blake3.AUTO).update_mmap(str(fpath)).hexdigest()
+
+    with open(fpath, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # 3.11+: zero-copy readinto path
+            return algo, hashlib.file_digest(f, algo).hexdigest()
+        h = hashlib.new(algo)
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+        return algo, h.hexdigest()
 
 
 def checksum_binaries(skill_path, checksum_file=None):
-    """Scan for binary/asset files and compute or verify SHA-256 checksums.
+    """Scan for binary/asset files and compute or verify checksums.
+
+    Manifests record the hash algorithm per entry ({"algo": ..., "digest": ...});
+    blake3 is preferred when installed, with sha256 as the fallback. Legacy
+    manifests that only carry a "sha256" field are still accepted.
 
     If checksum_file is provided, verify binaries against expected hashes.
     Otherwise, compute and report checksums for all binary/asset files found.
@@ -284,15 +512,11 @@ def checksum_binaries(skill_path, checksum_file=None):
     binaries_found = []
 
     # Find all binary/asset files
-    for root, dirs, files in os.walk(skill_path):
-        for f in files:
-            fpath = Path(root) / f
-            if fpath.suffix.lower() in BINARY_EXTENSIONS:
-                rel_path = str(fpath.relative_to(skill_path))
-                sha256 = hashlib.sha256(fpath.read_bytes()).hexdigest()
-                binaries_found.append({"path": rel_path, "sha256": sha256, "size": fpath.stat().st_size})
-
-    if not binaries_found:
+    binary_entries = [
+        e for e in _walk_files(skill_path) if _ext_of(e.name) in BINARY_EXTENSIONS
+    ]
+
+    if not binary_entries:
         return findings, binaries_found
 
     # If a checksum file is provided, verify against it
@@ -300,34 +524,60 @@ def checksum_binaries(skill_path, checksum_file=None):
         with open(checksum_file) as cf:
             expected = json.load(cf)
 
-        expected_map = {e["path"]: e["sha256"] for e in expected}
-        for b in binaries_found:
-            if b["path"] not in expected_map:
-                findings.append({
-                    "file": b["path"],
-                    "line": 0,
-                    "severity": "HIGH",
-                    "description": f"Binary not in checksum manifest — unverified asset ({b['size']} bytes)",
-                    "match": f"SHA-256: {b['sha256']}",
-                })
-            elif b["sha256"] != expected_map[b["path"]]:
-                findings.append({
-                    "file": b["path"],
-                    "line": 0,
-                    "severity": "CRITICAL",
-                    "description": "Binary checksum MISMATCH — file has been tampered with",
-                    "match": f"Expected: {expected_map[b['path']][:32]}... Got: {b['sha256'][:32]}...",
-                })
+        # Legacy manifests carry "sha256" instead of "algo"/"digest"
+        expected_map = {
+            e["path"]: (e.get("algo", "sha256"), e.get("digest") or e.get("sha256"))
+            for e in expected
+        }
+        for entry in binary_entries:
+            rel_path = os.path.relpath(entry.path, skill_path)
+            size = entry.stat().st_size
+            if rel_path not in expected_map:
+                algo, digest = _hash_file(entry.path)
+                binaries_found.append({"path": rel_path, "algo": algo, "digest": digest, "size": size})
+                findings.append(Finding(
+                    file=rel_path,
+                    line=0,
+                    severity="HIGH",
+                    description=f"Binary not in checksum manifest — unverified asset ({size} bytes)",
+                    match=f"{algo}: {digest}",
+                ))
+                continue
+
+            # Re-hash with the manifest's algorithm so old manifests still verify
+            want_algo, want_digest = expected_map[rel_path]
+            algo, digest = _hash_file(entry.path, want_algo)
+            binaries_found.append({"path": rel_path, "algo": algo, "digest": digest, "size": size})
+            if digest is None:
+                findings.append(Finding(
+                    file=rel_path,
+                    line=0,
+                    severity="HIGH",
+                    description=f"Cannot verify checksum — '{want_algo}' unavailable on this system",
+                    match=f"Expected {want_algo}: {want_digest[:32]}...",
+                ))
+            elif digest != want_digest:
+                findings.append(Finding(
+                    file=rel_path,
+                    line=0,
+                    severity="CRITICAL",
+                    description="Binary checksum MISMATCH — file has been tampered with",
+                    match=f"Expected: {want_digest[:32]}... Got: {digest[:32]}...",
+                ))
     else:
         # No checksum file — flag all binaries as unverified
-        for b in binaries_found:
-            findings.append({
-                "file": b["path"],
-                "line": 0,
-                "severity": "HIGH" if b["size"] > 100000 else "MEDIUM",
-                "description": f"Unverified binary asset ({b['size']} bytes) — no checksum manifest",
-                "match": f"SHA-256: {b['sha256']}",
-            })
+        for entry in binary_entries:
+            rel_path = os.path.relpath(entry.path, skill_path)
+            size = entry.stat().st_size
+            algo, digest = _hash_file(entry.path)
+            binaries_found.append({"path": rel_path, "algo": algo, "digest": digest, "size": size})
+            findings.append(Finding(
+                file=rel_path,
+                line=0,
+                severity="HIGH" if size > 100000 else "MEDIUM",
+                description=f"Unverified binary asset ({size} bytes) — no checksum manifest",
+                match=f"{algo}: {digest}",
+            ))
 
     return findings, binaries_found
 
@@ -359,39 +609,52 @@ def scan_directory(skill_path, verbose=False, checksum_file=None):
     if skill_md.exists() and _is_safe_path(skill_md, real_skill_path):
         findings.extend(scan_skill_md(str(skill_md)))
         # Also check for dynamic instruction fetching in SKILL.md
-        with open(skill_md) as f:
+        with open(skill_md, "rb") as f:
             content = f.read()
         findings.extend(scan_content(content, "SKILL.md", DYNAMIC_FETCH_PATTERNS))
     else:
-        findings.append({
-            "file": "SKILL.md",
-            "line": 0,
-            "severity": "MEDIUM",
-            "description": "No SKILL.md found — not a valid skill",
-            "match": "",
-        })
+        findings.append(Finding(
+            file="SKILL.md",
+            line=0,
+            severity="MEDIUM",
+            description="No SKILL.md found — not a valid skill",
+            match="",
+        ))
 
     # Scan all scripts and code files
     code_extensions = {".py", ".js", ".ts", ".sh", ".bash", ".rb", ".go", ".rs", ".pl"}
-    for root, dirs, files in os.walk(real_skill_path, followlinks=False):
-        for f in files:
-            fpath = Path(root) / f
-            # Skip symlinks — prevent reading files outside skill directory
-            if fpath.is_symlink():
-                findings.append({
-                    "file": str(fpath.relative_to(real_skill_path)),
-                    "line": 0,
-                    "severity": "HIGH",
-                    "description": "Symlink detected — potential directory escape",
-                    "match": f"→ {os.readlink(str(fpath))}",
-                })
+    for entry in _walk_files(real_skill_path):
+        # Skip vendored/generated trees entirely
+        if SKIP_PATH_RX.search(entry.path):
+            continue
+        # Skip symlinks — prevent reading files outside skill directory
+        if entry.is_symlink():
+            findings.append(Finding(
+                file=os.path.relpath(entry.path, real_skill_path),
+                line=0,
+                severity="HIGH",
+                description="Symlink detected — potential directory escape",
+                match=f"→ {os.readlink(entry.path)}",
+            ))
+            continue
+        if _ext_of(entry.name) in code_extensions:
+            # Minified bundles match line patterns thousands of times; skip
+            if entry.name.endswith(".min.js"):
+                continue
+            if entry.stat().st_size > MAX_SCAN_BYTES:
+                findings.append(Finding(
+                    file=os.path.relpath(entry.path, real_skill_path),
+                    line=0,
+                    severity="LOW",
+                    description=f"File too large to scan ({entry.stat().st_size} bytes) — skipped",
+                    match="",
+                ))
                 continue
-            if fpath.suffix in code_extensions:
-                try:
-                    findings.extend(scan_script(str(fpath)))
-                except Exception as e:
-                    if verbose:
-                        print(f"  Warning: Could not scan {fpath}: {e}", file=sys.stderr)
+            try:
+                findings.extend(scan_script(entry.path))
+            except Exception as e:
+                if verbose:
+                    print(f"  Warning: Could not scan {entry.path}: {e}", file=sys.stderr)
 
     # Checksum verification for binary/asset files
     checksum_findings, binaries = checksum_binaries(skill_path, checksum_file)
@@ -408,12 +671,11 @@ def format_findings(findings, skill_name="", json_output=False):
         result = {
             "skill": skill_name,
             "total_findings": len(findings),
-            "findings": findings,
+            "findings": [f._asdict() for f in findings],
         }
         by_severity = {}
         for f in findings:
-            sev = f["severity"]
-            by_severity[sev] = by_severity.get(sev, 0) + 1
+            by_severity[f.severity] = by_severity.get(f.severity, 0) + 1
         result["by_severity"] = by_severity
 
         critical = by_severity.get("CRITICAL", 0)
@@ -427,7 +689,7 @@ def format_findings(findings, skill_name="", json_output=False):
         else:
             result["verdict"] = "CLEAN"
 
-        print(json.dumps(result, indent=2))
+        print(_dumps(result))
         return
 
     if not findings:
@@ -436,8 +698,7 @@ def format_findings(findings, skill_name="", json_output=False):
 
     by_severity = {}
     for f in findings:
-        sev = f["severity"]
-        by_severity.setdefault(sev, []).append(f)
+        by_severity.setdefault(f.severity, []).append(f)
 
     critical = len(by_severity.get("CRITICAL", []))
     high = len(by_severity.get("HIGH", []))
@@ -458,11 +719,11 @@ def format_findings(findings, skill_name="", json_output=False):
             continue
         print(f"  [{severity}] ({len(items)} findings)")
         for item in items:
-            loc = f"{item['file']}:{item['line']}" if item['line'] else item['file']
-            print(f"    • {item['description']}")
+            loc = f"{item.file}:{item.line}" if item.line else item.file
+            print(f"    • {item.description}")
             print(f"      Location: {loc}")
-            if item['match']:
-                print(f"      Code: {item['match'][:100]}")
+            if item.match:
+                print(f"      Code: {item.match[:100]}")
         print()
 
 
@@ -476,7 +737,7 @@ def cmd_scan(args):
         findings = scan_directory(skill_path, verbose=args.verbose, checksum_file=checksum_file)
     elif args.file:
         skill_name = os.path.basename(args.file)
-        with open(args.file) as f:
+        with open(args.file, "rb") as f:
             content = f.read()
         findings = scan_content(content, skill_name, SUSPICIOUS_URL_PATTERNS)
         findings.extend(scan_content(content, skill_name, INJECTION_PATTERNS))
@@ -488,7 +749,7 @@ def cmd_scan(args):
     format_findings(findings, skill_name, json_output=args.json)
 
     # Exit with non-zero if critical/high findings
-    critical = sum(1 for f in findings if f["severity"] in ("CRITICAL", "HIGH"))
+    critical = sum(1 for f in findings if f.severity in ("CRITICAL", "HIGH"))
     if critical > 0:
         sys.exit(1)
 
@@ -509,8 +770,7 @@ def cmd_checksum(args):
         if findings:
             print(f"CHECKSUM VERIFICATION FAILED — {len(findings)} issue(s)")
             for f in findings:
-                sev = f["severity"]
-                print(f"  [{sev}] {f['file']}: {f['description']}")
+                print(f"  [{f.severity}] {f.file}: {f.description}")
             sys.exit(1)
         else:
             print(f"All {len(binaries)} binary checksum(s) verified OK")
@@ -520,19 +780,75 @@ def cmd_checksum(args):
         if not binaries:
             print("No binary/asset files found.")
             return
+        # Encode the manifest once; stdout and the output file share the bytes
+        buf = None
+        if args.json or args.output:
+            if orjson is not None:
+                buf = orjson.dumps(binaries, option=orjson.OPT_INDENT_2)
+            else:
+                buf = json.dumps(binaries, indent=2).encode()
         if args.json:
-            print(json.dumps(binaries, indent=2))
+            sys.stdout.buffer.write(buf)
+            sys.stdout.buffer.write(b"\n")
+            sys.stdout.buffer.flush()
         else:
             print(f"Found {len(binaries)} binary/asset file(s):")
             for b in binaries:
                 print(f"  {b['path']} ({b['size']} bytes)")
-                print(f"    SHA-256: {b['sha256']}")
+                print(f"    {b['algo']}: {b['digest']}")
         if args.output:
-            with open(args.output, 'w') as f:
-                json.dump(binaries, f, indent=2)
+            with open(args.output, 'wb') as f:
+                f.write(buf)
             print(f"\nChecksum manifest written to {args.output}")
 
 
+# scan-all result cache: skips re-scanning skills whose files are unchanged
+SCAN_CACHE_PATH = Path.home() / ".openclaw" / "cache" / "scanner-cache.json"
+
+# Version salt folded into every cache key: editing any pattern set or the
+# severity map must invalidate cached verdicts, not keep serving old ones
+_SCANNER_VERSION = hashlib.sha256(
+    repr((_SCRIPT_PATTERN_SETS, INJECTION_PATTERNS, _SEVERITY_MAP)).encode()
+).hexdigest()[:16]
+
+
+def _cache_key(skill_path):
+    """Fingerprint a skill directory; any file edit/add/remove/rename changes it.
+
+    Digest over per-file (relpath, size, mtime_ns) rather than an aggregate:
+    archive extraction and mv-based swaps can preserve mtimes and file count,
+    and a stale CLEAN verdict is not acceptable for a scanner.
+    """
+    root = str(skill_path)
+    entries = []
+    for entry in _walk_files(skill_path):
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        entries.append(f"{os.path.relpath(entry.path, root)}\0{st.st_size}\0{st.st_mtime_ns}")
+    entries.sort()
+    entries.insert(0, _SCANNER_VERSION)
+    return hashlib.sha256("\n".join(entries).encode()).hexdigest()[:32]
+
+
+def _load_scan_cache():
+    try:
+        with open(SCAN_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_scan_cache(cache):
+    try:
+        SCAN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(SCAN_CACHE_PATH, "w") as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+
 def cmd_scan_all(args):
     skill_dirs = [
         Path.home() / ".openclaw" / "skills",
@@ -541,6 +857,8 @@ def cmd_scan_all(args):
 
     total_findings = 0
     results = []
+    cache = _load_scan_cache()
+    cache_dirty = False
 
     for base_dir in skill_dirs:
         if not base_dir.exists():
@@ -549,12 +867,26 @@ def cmd_scan_all(args):
             if not skill_path.is_dir():
                 continue
             skill_name = skill_path.name
-            findings = scan_directory(skill_path)
+            key = _cache_key(skill_path)
+            cached = cache.get(str(skill_path))
+            if cached and cached.get("key") == key:
+                findings = [Finding(**f) for f in cached["findings"]]
+            else:
+                findings = scan_directory(skill_path)
+                cache[str(skill_path)] = {"key": key, "findings": [f._asdict() for f in findings]}
+                cache_dirty = True
             total_findings += len(findings)
             results.append({"name": skill_name, "path": str(skill_path), "findings": findings})
 
+    if cache_dirty:
+        _save_scan_cache(cache)
+
     if args.json:
-        print(json.dumps({"skills_scanned": len(results), "total_findings": total_findings, "results": results}, indent=2))
+        serializable = [
+            {"name": r["name"], "path": r["path"], "findings": [f._asdict() for f in r["findings"]]}
+            for r in results
+        ]
+        print(_dumps({"skills_scanned": len(results), "total_findings": total_findings, "results": serializable}))
     else:
         print(f"Scanned {len(results)} installed skills\n")
         for r in results:
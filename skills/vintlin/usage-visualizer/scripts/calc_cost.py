@@ -3,9 +3,22 @@ Model pricing data for LLM cost calculation
 Based on LiteLLM's model_prices_and_context_window.json
 Updated: 2026-02-16
 """
+import functools
 import json
 import os
-from typing import Dict, Optional, Tuple, Set
+import re
+from types import MappingProxyType
+from typing import Dict, List, Optional, Sequence, Tuple, Set
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch calls fall back to the scalar path
+    np = None
+
+try:
+    import numba
+except ImportError:  # Numba is optional; the NumPy ufunc path is used instead
+    numba = None
 
 # Track models without pricing
 UNKNOWN_MODELS: Set[str] = set()
@@ -109,21 +122,151 @@ MODEL_ALIASES = {
 }
 
 
+# Merged lookup table built once at import: pricing keys plus aliases, all
+# pointing at the same pricing dict objects (shared references, no copies).
+# The common path in get_pricing is then a single dict hit.
+_RESOLVED = {}
+_RESOLVED.update(MODEL_PRICING)
+for _alias, _target in MODEL_ALIASES.items():
+    _RESOLVED[_alias] = MODEL_PRICING[_target]
+
+# Per-token prices, scaled from per-1M once at import so the hot path does a
+# single tuple unpack instead of four dict lookups and four divisions.
+_SCALED = {
+    name: (
+        p.get("input", 0) / 1_000_000,
+        p.get("output", 0) / 1_000_000,
+        p.get("cache_read", 0) / 1_000_000,
+        p.get("cache_creation", 0) / 1_000_000,
+    )
+    for name, p in _RESOLVED.items()
+}
+
+# Dense price table for the vectorized batch path: row per resolved name plus
+# a trailing all-zero row for unknown models.
+if np is not None:
+    _MODEL_IDX = {name: i for i, name in enumerate(_SCALED)}
+    _UNKNOWN_ROW = len(_SCALED)
+    _PRICE_TABLE = np.array(
+        list(_SCALED.values()) + [(0.0, 0.0, 0.0, 0.0)], dtype=np.float64
+    )
+
+# Freeze the tables: lookups are unchanged, but accidental mutation raises,
+# and forked workers share the already-built structures read-only.
+MODEL_PRICING = MappingProxyType(MODEL_PRICING)
+MODEL_ALIASES = MappingProxyType(MODEL_ALIASES)
+_RESOLVED = MappingProxyType(_RESOLVED)
+
+# Provider per pricing key, resolved once at import; runtime classification
+# of known models is then a single dict hit with no lower() allocations
+_PROVIDER_RE = re.compile(r"(claude|anthropic)|(gpt|openai)|(gemini)", re.IGNORECASE)
+_PROVIDER_NAMES = ("anthropic", "openai", "gemini")
+_MODEL_PROVIDER = {}
+for _name in _RESOLVED:
+    _m = _PROVIDER_RE.search(_name)
+    _MODEL_PROVIDER[_name] = _PROVIDER_NAMES[_m.lastindex - 1] if _m else "unknown"
+
+
+@functools.lru_cache(maxsize=1024)
+def _provider_fallback(model: str) -> str:
+    """Regex classification for names outside the pricing table (memoized)"""
+    m = _PROVIDER_RE.search(model)
+    return _PROVIDER_NAMES[m.lastindex - 1] if m else "unknown"
+
+
+def get_provider(model: str) -> str:
+    """Get the provider for a model name"""
+    provider = _MODEL_PROVIDER.get(model)
+    if provider is not None:
+        return provider
+    return _provider_fallback(model)
+
+
+# Date/variant suffixes commonly appended to base model names
+_STEM_RE = re.compile(r"(-\d{4}-\d{2}-\d{2}|-\d{8}|-\d{4}|-preview|-latest)$")
+# Trailing dash-spelled version for families the table spells with a dot,
+# e.g. "claude-sonnet-4-5" vs the table key "claude-sonnet-4.5"
+_DASH_VERSION_RE = re.compile(r"-(\d+)-(\d+)$")
+
+
+@functools.lru_cache(maxsize=4096)
+def _slow_partial(model: str) -> Optional[Dict]:
+    """Fallback for names missing from the merged table: strip date/variant
+    suffixes one at a time, retrying the exact lookup after each strip, then
+    try the dotted spelling of a trailing dash version (memoized). Replaces
+    the old O(N) substring scan, which could also match the wrong model."""
+    stem = model
+    while True:
+        stripped = _STEM_RE.sub("", stem)
+        if stripped == stem:
+            break
+        stem = stripped
+        hit = _RESOLVED.get(stem)
+        if hit is not None:
+            return hit
+    # claude-sonnet-4-5-20250929 stems to claude-sonnet-4-5; the table
+    # spells that family claude-sonnet-4.5
+    dotted = _DASH_VERSION_RE.sub(r"-\1.\2", stem)
+    if dotted != model:
+        return _RESOLVED.get(dotted)
+    return None
+
+
 def get_pricing(model: str) -> Optional[Dict]:
     """Get pricing for a model"""
-    # Check aliases first
-    pricing_key = MODEL_ALIASES.get(model, model)
+    # Single lookup covers both exact names and aliases
+    return _RESOLVED.get(model) or _slow_partial(model)
 
-    # Try exact match
-    if pricing_key in MODEL_PRICING:
-        return MODEL_PRICING[pricing_key]
 
-    # Try partial match (e.g., gpt-4o-mini matches gpt-4o-mini)
-    for key in MODEL_PRICING:
-        if key in model or model in key:
-            return MODEL_PRICING[key]
+@functools.lru_cache(maxsize=65536)
+def _calculate_cost_cached(
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int,
+    cache_creation_tokens: int
+) -> Optional[Tuple[float, float]]:
+    """Pure cost computation, memoized; returns None for unknown models"""
+    scaled = _SCALED.get(model)
+
+    if scaled is None:
+        pricing = get_pricing(model)
+        if pricing is None:
+            return None
+        # Partial-match hit: scale on the fly (rare path)
+        scaled = (
+            pricing.get("input", 0) / 1_000_000,
+            pricing.get("output", 0) / 1_000_000,
+            pricing.get("cache_read", 0) / 1_000_000,
+            pricing.get("cache_creation", 0) / 1_000_000,
+        )
+
+    input_price, output_price, cache_read_price, cache_creation_price = scaled
 
-    return None
+    # Calculate costs
+    # For regular input tokens (not from cache)
+    billable_input = max(0, input_tokens - cache_read_tokens)
+
+    input_cost = billable_input * input_price
+
+    # Cache read tokens (90% discount for Anthropic)
+    cache_read_cost = cache_read_tokens * cache_read_price
+
+    # Cache creation tokens
+    cache_creation_cost = cache_creation_tokens * cache_creation_price
+
+    # Output tokens
+    output_cost = output_tokens * output_price
+
+    total_cost = input_cost + cache_read_cost + cache_creation_cost + output_cost
+
+    # Calculate Savings (What it would have cost without cache)
+    # Savings = (cache_read_tokens * input_price) - cache_read_cost
+    savings = cache_read_tokens * (input_price - cache_read_price)
+    if savings < 0: savings = 0
+
+    # Full precision here; rounding happens at display/serialization time
+    return float(total_cost), float(savings)
 
 
 def calculate_cost(
@@ -146,44 +289,131 @@ def calculate_cost(
     Returns:
         (Cost, Savings) in USD
     """
-    pricing = get_pricing(model)
+    result = _calculate_cost_cached(
+        model, input_tokens, output_tokens, cache_read_tokens, cache_creation_tokens
+    )
 
-    if pricing is None:
+    if result is None:
         # No pricing available - track and return 0
         UNKNOWN_MODELS.add(model)
         return 0.0, 0.0
 
-    # Base cost calculation
-    input_price = pricing.get("input", 0) / 1_000_000
-    output_price = pricing.get("output", 0) / 1_000_000
-    cache_read_price = pricing.get("cache_read", 0) / 1_000_000
-    cache_creation_price = pricing.get("cache_creation", 0) / 1_000_000
-
-    # Calculate costs
-    # For regular input tokens (not from cache)
-    billable_input = input_tokens - cache_read_tokens
-    if billable_input < 0:
-        billable_input = 0
-
-    input_cost = billable_input * input_price
-
-    # Cache read tokens (90% discount for Anthropic)
-    cache_read_cost = cache_read_tokens * cache_read_price
-
-    # Cache creation tokens
-    cache_creation_cost = cache_creation_tokens * cache_creation_price
-
-    # Output tokens
-    output_cost = output_tokens * output_price
-
-    total_cost = input_cost + cache_read_cost + cache_creation_cost + output_cost
+    return result
+
+
+if np is not None and numba is not None:
+    @numba.njit(cache=True, fastmath=True, parallel=True)
+    def _cost_kernel(inp, out, cache_r, cache_c, prices):
+        """LLVM-compiled fused cost/savings loop over parallel columns"""
+        n = inp.shape[0]
+        cost = np.empty(n)
+        savings = np.empty(n)
+        for i in numba.prange(n):
+            ip = prices[i, 0]
+            op = prices[i, 1]
+            crp = prices[i, 2]
+            ccp = prices[i, 3]
+            # max() compiles to a branchless select, keeping the loop
+            # eligible for SIMD vectorization
+            billable = max(0.0, inp[i] - cache_r[i])
+            cost[i] = (billable * ip + out[i] * op
+                       + cache_r[i] * crp + cache_c[i] * ccp)
+            saved = cache_r[i] * (ip - crp)
+            savings[i] = saved if saved > 0.0 else 0.0
+        return cost, savings
+else:
+    _cost_kernel = None
+
+
+@functools.lru_cache(maxsize=65536)
+def compute_savings(model: str, cache_read_tokens: int = 0) -> float:
+    """
+    Estimate cache savings without the full cost calculation.
 
-    # Calculate Savings (What it would have cost without cache)
-    # Savings = (cache_read_tokens * input_price) - cache_read_cost
-    savings = cache_read_tokens * (input_price - cache_read_price)
-    if savings < 0: savings = 0
+    Used when the session already reports a real cost and only the savings
+    figure is needed: savings = cache_read_tokens * (input - cache_read price).
+    """
+    if cache_read_tokens <= 0:
+        return 0.0
+
+    scaled = _SCALED.get(model)
+    if scaled is None:
+        pricing = get_pricing(model)
+        if pricing is None:
+            return 0.0
+        scaled = (
+            pricing.get("input", 0) / 1_000_000,
+            pricing.get("output", 0) / 1_000_000,
+            pricing.get("cache_read", 0) / 1_000_000,
+            pricing.get("cache_creation", 0) / 1_000_000,
+        )
+
+    savings = cache_read_tokens * (scaled[0] - scaled[2])
+    if savings < 0:
+        return 0.0
+    return float(savings)
+
+
+@functools.lru_cache(maxsize=4096)
+def _model_index(model: str) -> int:
+    """Map a model name to its price-table row (the zero row if unknown)"""
+    idx = _MODEL_IDX.get(model)
+    if idx is not None:
+        return idx
+    pricing = get_pricing(model)
+    if pricing is not None:
+        # Partial match resolves to a shared pricing dict; find its canonical key
+        for key, p in MODEL_PRICING.items():
+            if p is pricing:
+                return _MODEL_IDX[key]
+    return _UNKNOWN_ROW
+
+
+def calculate_cost_batch(
+    models: Sequence[str],
+    input_tokens: Sequence[int],
+    output_tokens: Sequence[int],
+    cache_read_tokens: Sequence[int],
+    cache_creation_tokens: Sequence[int]
+) -> Tuple[List[float], List[float]]:
+    """
+    Calculate costs for parallel columns of records in one vectorized pass.
 
-    return float(round(total_cost, 6)), float(round(savings, 6))
+    Returns (costs, savings) lists aligned with the inputs. Falls back to the
+    scalar calculate_cost loop when NumPy is not installed.
+    """
+    if np is None:
+        costs, savings = [], []
+        for args in zip(models, input_tokens, output_tokens,
+                        cache_read_tokens, cache_creation_tokens):
+            c, s = calculate_cost(*args)
+            costs.append(c)
+            savings.append(s)
+        return costs, savings
+
+    n = len(models)
+    ids = np.fromiter((_model_index(m) for m in models), dtype=np.int64, count=n)
+    prices = _PRICE_TABLE[ids]
+
+    inp = np.asarray(input_tokens, dtype=np.float64)
+    out = np.asarray(output_tokens, dtype=np.float64)
+    cache_r = np.asarray(cache_read_tokens, dtype=np.float64)
+    cache_c = np.asarray(cache_creation_tokens, dtype=np.float64)
+
+    if _cost_kernel is not None:
+        # Single fused, auto-vectorized pass instead of several ufunc sweeps
+        cost, savings = _cost_kernel(inp, out, cache_r, cache_c, prices)
+    else:
+        billable = np.maximum(inp - cache_r, 0.0)
+        cost = (billable * prices[:, 0] + out * prices[:, 1]
+                + cache_r * prices[:, 2] + cache_c * prices[:, 3])
+        savings = np.maximum(cache_r * (prices[:, 0] - prices[:, 2]), 0.0)
+
+    unknown = ids == _UNKNOWN_ROW
+    if unknown.any():
+        UNKNOWN_MODELS.update(models[i] for i in np.nonzero(unknown)[0])
+
+    return cost.tolist(), savings.tolist()
 
 
 def load_pricing_from_file(filepath: str) -> Dict:
@@ -3,19 +3,30 @@
 Fetch usage data from OpenClaw sessions AND optionally from external APIs
 """
 import argparse
+import functools
+import hashlib
 import json
 import os
 import sys
 import glob
+import mmap
 import yaml
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; stdlib json works on bytes too
+    orjson = None
+    _loads = json.loads
+
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from store import UsageStore
-from calc_cost import calculate_cost
+from calc_cost import calculate_cost_batch, compute_savings, get_provider
 
 
 # Default OpenClaw session paths
@@ -24,11 +35,60 @@ DEFAULT_OPENCLAW_PATHS = [
     os.path.expanduser("~/.clawdbot/agents/*/sessions/*.jsonl"),
 ]
 
+# Candidate key spellings for each token field (camelCase and snake_case)
+_INPUT_KEYS = ("inputTokens", "input_tokens")
+_OUTPUT_KEYS = ("outputTokens", "output_tokens")
+_TOTAL_KEYS = ("totalTokens", "total_tokens")
+_CACHE_READ_KEYS = ("cacheReadTokens", "cache_read_tokens")
+_CACHE_CREATION_KEYS = ("cacheCreationTokens", "cache_creation_tokens")
+
+
+def _pick(d: Dict, keys: tuple, default=0):
+    """Return the first truthy value among candidate key spellings"""
+    for k in keys:
+        v = d.get(k)
+        if v:
+            return v
+    return default
+
+
+# Roots walked by the scandir-based discovery (same layout as the glob
+# patterns above: <root>/agents/<agent>/sessions/*.jsonl)
+_DEFAULT_AGENT_ROOTS = [
+    os.path.expanduser("~/.openclaw/agents"),
+    os.path.expanduser("~/.clawdbot/agents"),
+]
+
+
+def _scan_agent_sessions(agents_root: str) -> List[str]:
+    """Collect session files under one agents root via os.scandir"""
+    files = []
+    try:
+        with os.scandir(agents_root) as agents:
+            for agent in agents:
+                if not agent.is_dir():
+                    continue
+                try:
+                    with os.scandir(os.path.join(agent.path, "sessions")) as entries:
+                        for entry in entries:
+                            if entry.name.endswith(".jsonl") and entry.is_file():
+                                files.append(entry.path)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files
+
 
 def find_session_files(patterns: List[str] = None) -> List[str]:
     """Find all OpenClaw session JSONL files"""
     if patterns is None:
-        patterns = DEFAULT_OPENCLAW_PATHS
+        # Known layout: walk it with scandir, which avoids glob's extra
+        # stat calls on every path component
+        files = []
+        for root in _DEFAULT_AGENT_ROOTS:
+            files.extend(_scan_agent_sessions(root))
+        return sorted(set(files))
 
     files = []
     for pattern in patterns:
@@ -41,98 +101,122 @@ def parse_openclaw_session(file_path: str, date: str = None) -> List[Dict]:
     """Parse OpenClaw session file and extract usage data"""
     usage_records = []
 
-    try:
-        with open(file_path, 'r') as f:
-            for line in f:
-                if not line.strip():
-                    continue
+    # Precompute the day's epoch bounds so numeric timestamps are filtered
+    # with one float comparison instead of a datetime + strftime per line
+    # Default date for records without a usable timestamp, computed once
+    # instead of per line
+    default_date = datetime.now().strftime("%Y-%m-%d")
 
-                try:
-                    data = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
+    day_start_ts = day_end_ts = None
+    if date:
+        try:
+            day_start_ts = datetime.fromisoformat(date).timestamp()
+            day_end_ts = day_start_ts + 86400
+        except ValueError:
+            pass
+
+    try:
+        with open(file_path, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return usage_records  # empty file
+            with mm:
+                for line in iter(mm.readline, b''):
+                    # Cheap first-byte check skips blank and junk lines
+                    # without a strip() allocation or an exception
+                    if line[:1] not in (b'{', b'[', b' ', b'\t'):
+                        continue
 
-                # Extract timestamp to filter by date
-                timestamp = data.get("timestamp") or data.get("created_at")
-                record_date = datetime.now().strftime("%Y-%m-%d")
-                if timestamp:
                     try:
+                        # orjson parses bytes directly, skipping a decode pass
+                        data = _loads(line)
+                    except ValueError:
+                        continue
+
+                    # Extract timestamp to filter by date
+                    timestamp = data.get("timestamp") or data.get("created_at")
+                    record_date = default_date
+                    if timestamp:
                         # Handle various timestamp formats
                         if isinstance(timestamp, (int, float)):
-                            record_date = datetime.fromtimestamp(timestamp / 1000).strftime("%Y-%m-%d")
+                            ts = timestamp / 1000
+                            if day_start_ts is not None:
+                                # Pure float comparison on the filtered path
+                                if not (day_start_ts <= ts < day_end_ts):
+                                    continue
+                                record_date = date
+                            else:
+                                try:
+                                    record_date = datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+                                except (ValueError, OSError):
+                                    pass
+                        elif (len(timestamp) >= 10 and timestamp[4] == "-"
+                              and timestamp[7] == "-"):
+                            # ISO string: the date is the first 10 characters
+                            if date and timestamp[:10] != date:
+                                continue
+                            record_date = timestamp[:10]
                         else:
-                            record_date = datetime.fromisoformat(timestamp.replace("Z", "+00:00")).strftime("%Y-%m-%d")
-
-                        if date and record_date != date:
-                            continue
-                    except (ValueError, OSError):
-                        pass
-
-                # Extract usage data from message
-                message = data.get("message", {})
-
-                # Try different paths for usage
-                usage = (
-                    message.get("usage") or
-                    data.get("usage") or
-                    data.get("metrics", {}).get("usage")
-                )
-
-                if not usage:
-                    continue
-
-                # Extract model info
-                model = (
-                    message.get("model") or
-                    data.get("model") or
-                    data.get("model_alias") or
-                    "unknown"
-                )
-
-                # Determine provider from model
-                if "claude" in model.lower() or "anthropic" in model.lower():
-                    provider = "anthropic"
-                elif "gpt" in model.lower() or "openai" in model.lower():
-                    provider = "openai"
-                elif "gemini" in model.lower():
-                    provider = "gemini"
-                else:
-                    provider = "unknown"
-
-                # Extract token counts
-                input_tokens = usage.get("inputTokens", 0) or usage.get("input_tokens", 0) or 0
-                output_tokens = usage.get("outputTokens", 0) or usage.get("output_tokens", 0) or 0
-                total_tokens = usage.get("totalTokens", 0) or usage.get("total_tokens", 0) or 0
-
-                # Handle combined total if separate not available
-                if not input_tokens and not output_tokens and total_tokens:
-                    input_tokens = total_tokens // 2
-                    output_tokens = total_tokens - input_tokens
-
-                # Cache tokens (Anthropic)
-                cache_read_tokens = usage.get("cacheReadTokens", 0) or usage.get("cache_read_tokens", 0) or 0
-                cache_creation_tokens = usage.get("cacheCreationTokens", 0) or usage.get("cache_creation_tokens", 0) or 0
-
-                # Cost - prefer real cost if available (check if field exists first)
-                cost = None
+                            try:
+                                record_date = datetime.fromisoformat(
+                                    timestamp.replace("Z", "+00:00")).strftime("%Y-%m-%d")
+                                if date and record_date != date:
+                                    continue
+                            except ValueError:
+                                pass
+
+                    # Extract usage data from message
+                    message = data.get("message", {})
+
+                    # Try different paths for usage
+                    usage = (
+                        message.get("usage") or
+                        data.get("usage") or
+                        data.get("metrics", {}).get("usage")
+                    )
+
+                    if not usage:
+                        continue
+
+                    # Extract model info
+                    model = (
+                        message.get("model") or
+                        data.get("model") or
+                        data.get("model_alias") or
+                        "unknown"
+                    )
+
+                    # Determine provider from model (precomputed per pricing
+                    # key; regex fallback only for unknown names)
+                    provider = get_provider(model)
+
+                    # Extract token counts
+                    input_tokens = _pick(usage, _INPUT_KEYS)
+                    output_tokens = _pick(usage, _OUTPUT_KEYS)
+                    total_tokens = _pick(usage, _TOTAL_KEYS)
+
+                    # Handle combined total if separate not available
+                    if not input_tokens and not output_tokens and total_tokens:
+                        input_tokens = total_tokens // 2
+                        output_tokens = total_tokens - input_tokens
+
+                    # Cache tokens (Anthropic)
+                    cache_read_tokens = _pick(usage, _CACHE_READ_KEYS)
+                    cache_creation_tokens = _pick(usage, _CACHE_CREATION_KEYS)
+
+                    # Cost - prefer real cost if available (check if field exists first)
+                    cost = None
                 
-                # Try different paths for cost
-                if isinstance(usage.get("cost"), dict):
-                    cost = usage.get("cost", {}).get("total")
-                elif "cost" in usage:
-                    cost = usage.get("cost")
-                elif "totalCost" in usage:
-                    cost = usage.get("totalCost")
+                    # Try different paths for cost
+                    if isinstance(usage.get("cost"), dict):
+                        cost = usage.get("cost", {}).get("total")
+                    elif "cost" in usage:
+                        cost = usage.get("cost")
+                    elif "totalCost" in usage:
+                        cost = usage.get("totalCost")
                 
-                # If no real cost (None), calculate it
-                if cost is None:
-                    cost_val, savings = calculate_cost(model, input_tokens, output_tokens, cache_read_tokens, cache_creation_tokens)
-                else:
-                    # If cost provided by API/OpenClaw, we estimate savings for consistent reporting
-                    cost_val = cost
-                    _, savings = calculate_cost(model, input_tokens, output_tokens, cache_read_tokens, cache_creation_tokens)
-
-                if input_tokens or output_tokens or cost_val:
+                    # Cost is filled in by the batch pass below when None
                     usage_records.append({
                         "date": record_date,
                         "provider": provider,
@@ -141,16 +225,96 @@ def parse_openclaw_session(file_path: str, date: str = None) -> List[Dict]:
                         "output_tokens": output_tokens,
                         "cache_read_tokens": cache_read_tokens,
                         "cache_creation_tokens": cache_creation_tokens,
-                        "cost": cost_val,
-                        "savings": savings
+                        "cost": cost,
+                        "savings": 0.0
                     })
 
     except Exception as e:
         print(f"Error reading {file_path}: {e}")
 
+    # Second pass: compute costs and savings for the whole file in one
+    # vectorized call instead of per-record arithmetic. Records with a real
+    # cost from the session skip the full calculation and only estimate
+    # savings, which is the bulk of the arithmetic saved.
+    if usage_records:
+        pending = [r for r in usage_records if r["cost"] is None]
+        if pending:
+            costs, savings = calculate_cost_batch(
+                [r["model"] for r in pending],
+                [r["input_tokens"] for r in pending],
+                [r["output_tokens"] for r in pending],
+                [r["cache_read_tokens"] for r in pending],
+                [r["cache_creation_tokens"] for r in pending],
+            )
+            for record, cost_val, saved in zip(pending, costs, savings):
+                record["cost"] = cost_val
+                record["savings"] = saved
+
+        for record in usage_records:
+            if record["cache_read_tokens"] and not record["savings"]:
+                record["savings"] = compute_savings(
+                    record["model"], record["cache_read_tokens"]
+                )
+
+        usage_records = [
+            r for r in usage_records
+            if r["input_tokens"] or r["output_tokens"] or r["cost"]
+        ]
+
     return usage_records
 
 
+def parse_openclaw_session_cached(file_path: str, date: str = None,
+                                  cache_dir: str = None) -> List[Dict]:
+    """parse_openclaw_session with an on-disk cache keyed by (path, date)
+    and the file's mtime/size signature, so unchanged files skip re-parsing"""
+    if cache_dir is None:
+        return parse_openclaw_session(file_path, date)
+
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return parse_openclaw_session(file_path, date)
+
+    tag = hashlib.sha256(f"{file_path}|{date}".encode()).hexdigest()[:16]
+    sig = f"{st.st_mtime_ns}-{st.st_size}"
+    cache_file = os.path.join(cache_dir, f"{tag}-{sig}.json")
+
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                return _loads(f.read())
+        except (OSError, ValueError):
+            pass  # corrupt or unreadable cache entry; re-parse
+
+    records = parse_openclaw_session(file_path, date)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Drop stale signatures for this file, then write atomically
+        for name in os.listdir(cache_dir):
+            if name.startswith(tag + "-") and name != os.path.basename(cache_file):
+                try:
+                    os.remove(os.path.join(cache_dir, name))
+                except OSError:
+                    pass
+        tmp_file = cache_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(records, f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass  # caching is best-effort
+
+    return records
+
+
+@functools.lru_cache(maxsize=8)
+def _load_yaml(path: str, mtime_ns: int) -> Dict:
+    """Parse a config file once per (path, mtime); repeat calls are cached"""
+    with open(path, 'r') as f:
+        return yaml.safe_load(f) or {}
+
+
 def load_config(config_path: str = "config/config.yaml") -> Dict:
     """Load optional configuration"""
     base_dir = os.path.dirname(os.path.dirname(__file__))
@@ -161,9 +325,11 @@ def load_config(config_path: str = "config/config.yaml") -> Dict:
     ]
 
     for path in paths_to_try:
-        if os.path.exists(path):
-            with open(path, 'r') as f:
-                return yaml.safe_load(f) or {}
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        return _load_yaml(os.path.abspath(path), st.st_mtime_ns)
 
     return {}
 
@@ -188,38 +354,37 @@ def fetch_openclow_usage(date: str = None, storage_path: str = "~/.llm-cost-moni
 
     print(f"Found {len(session_files)} session files")
 
-    total_records = 0
+    # Parsing is CPU-bound (JSON + arithmetic) and files are independent, so
+    # parse in parallel; database writes stay on the main process.
+    cache_dir = os.path.join(store.storage_path, "parse_cache")
+    parse = functools.partial(parse_openclaw_session_cached, date=date,
+                              cache_dir=cache_dir)
+    if len(session_files) > 1:
+        workers = min(os.cpu_count() or 1, len(session_files))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = zip(session_files, executor.map(parse, session_files, chunksize=4))
+            parsed = list(parsed)
+    else:
+        parsed = [(path, parse(path)) for path in session_files]
+
+    # Accumulate everything and write in one transaction instead of a
+    # commit per record
+    all_records = []
+    for file_path, records in parsed:
+        # Use file path as api_key hash for OpenClaw sessions
+        api_key = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
 
-    for file_path in session_files:
-        records = parse_openclaw_session(file_path, date)
+        # Determine app from path (openclaw or clawdbot)
+        app = "clawdbot" if ".clawdbot" in file_path else "openclaw"
 
         for record in records:
-            # Use file path as api_key hash for OpenClaw sessions
-            api_key = os.path.basename(os.path.dirname(os.path.dirname(file_path)))
-            
-            # Determine app from path (openclaw or clawdbot)
-            if ".openclaw" in file_path:
-                app = "openclaw"
-            elif ".clawdbot" in file_path:
-                app = "clawdbot"
-            else:
-                app = "openclaw"
-
-            store.add_usage(
-                date=record["date"],
-                provider=record["provider"],
-                api_key=api_key,
-                model=record["model"],
-                app=app,
-                source="session",
-                input_tokens=record["input_tokens"],
-                output_tokens=record["output_tokens"],
-                cache_read_tokens=record.get("cache_read_tokens", 0),
-                cache_creation_tokens=record.get("cache_creation_tokens", 0),
-                cost=record["cost"],
-                savings=record.get("savings", 0)
-            )
-            total_records += 1
+            record["api_key"] = api_key
+            record["app"] = app
+            record["source"] = "session"
+            all_records.append(record)
+
+    store.add_usage_bulk(all_records)
+    total_records = len(all_records)
 
     print(f"Processed {total_records} usage records from OpenClaw")
     return total_records
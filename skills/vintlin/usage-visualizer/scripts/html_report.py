@@ -3,15 +3,58 @@
 Generate visually appealing HTML reports for LLM cost monitoring - Vertical Stacked PPT Style V5 (Fixed Logic)
 """
 import argparse
+import functools
+import hashlib
+import heapq
 import os
 import sys
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from store import UsageStore
 
+# Display names checked against lowercased model names in clean_m
+_CLEAN_KEYS = [('MiniMax', 'minimax'), ('Claude', 'claude'),
+               ('Gemini', 'gemini'), ('GPT', 'gpt')]
+
+
+# Loop-body templates with constant inline styles; str.format fills in the
+# varying pieces instead of rebuilding the whole literal per iteration
+_MODEL_ROW_TPL = """<div style="margin-bottom:24px">
+                <div style="display:flex;justify-content:space-between;margin-bottom:8px;font-size:13px"><span style="color:#10b981;font-weight:600">{name}</span><span>{tokens}</span></div>
+                <div style="height:6px;background:#2a2a2a;border-radius:3px;overflow:hidden;margin-bottom:6px"><div style="height:100%;width:{pct:.1f}%;background:#10b981"></div></div>
+                <div style="font-size:10px;color:#6b7280;display:flex;justify-content:space-between"><span>Unit Cost: ${u_cost:.2f}/M</span><span>Cost: {cost}</span></div></div>"""
+
+_DAY_BAR_TPL = """<div style="flex:1;display:flex;flex-direction:column;align-items:center;gap:10px">
+                    <div style="font-size:10px;color:#10b981;font-weight:600">{tokens_label}</div>
+                    <div style="width:100%;background:#2a2a2a;border-radius:8px;height:120px;position:relative;overflow:hidden">
+                    <div style="position:absolute;bottom:0;width:100%;height:{h_pct:.1f}%;background:linear-gradient(0deg,#059669,#10b981);border-radius:4px"></div></div>
+                    <span style="font-size:11px;color:#6b7280">{label}</span></div>"""
+
+
+@functools.lru_cache(maxsize=256)
+def clean_m(m):
+    """Shorten a model name to its family label for chart legends"""
+    m_lower = m.lower()
+    for label, needle in _CLEAN_KEYS:
+        if needle in m_lower: return label
+    return (m[:10]+'..') if len(m)>10 else m
+
+
+# Hot formatters at module scope: no closure rebuild per report, and repeated
+# values (peaks, bar labels reuse the same daily totals) hit the cache
+@functools.lru_cache(maxsize=1024)
+def fmt_tokens(t):
+    if t >= 1000000: return f"{t/1000000:.1f}M"
+    if t >= 1000: return f"{t/1000:.1f}K"
+    return str(int(t))
+
+
+def fmt_cost(c): return f"${c:.2f}"
+
 
 def generate_html_report(
     store: UsageStore,
@@ -21,90 +64,114 @@ def generate_html_report(
 ) -> str:
     """Generate a horizontal PPT-style HTML report with improved Top-N logic and detailed labels"""
     
-    today_dt = datetime.now()
+    # Plain date arithmetic + isoformat throughout; strftime/strptime parse
+    # their format string on every call
+    today_date = datetime.now().date()
     if not start_date:
         # Default start to the beginning of the week or month
-        start_date = today_dt.replace(day=1).strftime("%Y-%m-%d")
+        start_date = today_date.replace(day=1).isoformat()
     if not end_date:
-        end_date = today_dt.strftime("%Y-%m-%d")
-    
+        end_date = today_date.isoformat()
+
     # Trend ranges (Fixed 30 days)
-    last_30_dates = [(today_dt - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(29, -1, -1)]
+    last_30_dates = [(today_date - timedelta(days=i)).isoformat() for i in range(29, -1, -1)]
     trend_start_date = last_30_dates[0]
-    
+
     # Comparison range (Previous period of same length)
-    requested_start = datetime.strptime(start_date, "%Y-%m-%d")
-    requested_end = datetime.strptime(end_date, "%Y-%m-%d")
+    requested_start = date.fromisoformat(start_date)
+    requested_end = date.fromisoformat(end_date)
     period_days = (requested_end - requested_start).days + 1
-    prev_start_date = (requested_start - timedelta(days=period_days)).strftime("%Y-%m-%d")
-    prev_end_date = (requested_start - timedelta(days=1)).strftime("%Y-%m-%d")
+    prev_start_date = (requested_start - timedelta(days=period_days)).isoformat()
+    prev_end_date = (requested_start - timedelta(days=1)).isoformat()
 
-    # Fetch data
-    all_data = store.get_usage(min(trend_start_date, prev_start_date), end_date)
-    
-    daily_total = {}
-    daily_models = {}
-    period_model_tokens = {}
-    period_model_cost = {}
-    total_savings = 0
-    prev_period_cost = 0
-    trend_model_tokens = {} # For selecting Top N models over 30 days
-
-    for record in all_data:
-        date = record['date']
-        model = record['model']
-        
-        # Daily aggregations for trends
-        if date not in daily_total: daily_total[date] = {'cost': 0, 'tokens': 0}
-        daily_total[date]['cost'] += record['cost']
-        daily_total[date]['tokens'] += record['input_tokens'] + record['output_tokens']
-        
-        if date not in daily_models: daily_models[date] = {}
-        if model not in daily_models[date]: daily_models[date][model] = {'cost': 0, 'tokens': 0}
-        daily_models[date][model]['cost'] += record['cost']
-        daily_models[date][model]['tokens'] += record['input_tokens'] + record['output_tokens']
-        
-        # Requested period stats
-        if start_date <= date <= end_date:
-            period_model_tokens[model] = period_model_tokens.get(model, 0) + record['input_tokens'] + record['output_tokens']
-            period_model_cost[model] = period_model_cost.get(model, 0) + record['cost']
-            total_savings += record.get('savings', 0)
-            
-        # 30-day Trend period stats (for picking Top models to show as lines)
-        if trend_start_date <= date <= end_date:
-            trend_model_tokens[model] = trend_model_tokens.get(model, 0) + record['input_tokens'] + record['output_tokens']
-            
-        # Previous period stats
-        if prev_start_date <= date <= prev_end_date:
-            prev_period_cost += record['cost']
+    # The rendered report only changes when rows in the queried windows
+    # change; memoize the finished HTML on disk keyed by report tag + data
+    # version, like the parse cache's tag-sig files
+    version = store.get_data_version(min(trend_start_date, prev_start_date), end_date)
+    cache_tag = hashlib.sha256(
+        f"{title}|{start_date}|{end_date}|{trend_start_date}".encode()
+    ).hexdigest()[:16]
+    cache_sig = hashlib.sha256(version.encode()).hexdigest()[:16]
+    cache_dir = os.path.join(store.storage_path, "report_cache")
+    cache_name = f"llm-cost-report.{cache_tag}-{cache_sig}.html"
+    cache_path = os.path.join(cache_dir, cache_name)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        pass  # no cached render yet
+
+    # One UNION ALL round trip covering the three windows, each aggregated
+    # server-side: daily resolution is only needed inside the 30-day trend
+    # window, and the requested/previous periods only need per-model totals
+    windows = store.get_report_windows(trend_start_date, start_date, end_date,
+                                       prev_start_date, prev_end_date)
+    trend_rows = windows['trend']
+
+    daily_total = defaultdict(lambda: {'cost': 0, 'tokens': 0})
+    daily_models = defaultdict(dict)
+    trend_model_tokens = defaultdict(int) # For selecting Top N models over 30 days
+
+    for row in trend_rows:
+        row_date = row['date']
+        model = row['model']
+        tokens = row['tokens']
+        cost = row['cost']
+
+        day = daily_total[row_date]
+        day['cost'] += cost
+        day['tokens'] += tokens
+
+        daily_models[row_date][model] = {'cost': cost, 'tokens': tokens}
+        trend_model_tokens[model] += tokens
+
+    # Pre-fill every chart date (the 7-day window is inside the 30-day one)
+    # so the render paths can index directly instead of chaining .get defaults
+    zero_day = {'cost': 0, 'tokens': 0}
+    for d in last_30_dates:
+        if d not in daily_total:
+            daily_total[d] = dict(zero_day)
+        if d not in daily_models:
+            daily_models[d] = {}
+
+    # Requested period stats
+    period_summary = windows['period']
+    period_model_tokens = {m: v['tokens'] for m, v in period_summary.items()}
+    period_model_cost = {m: v['cost'] for m, v in period_summary.items()}
+    total_savings = sum(v['savings'] for v in period_summary.values())
+
+    # Previous period stats
+    prev_period_cost = sum(v['cost'] for v in windows['prev'].values())
 
     total_cost = sum(period_model_cost.values())
     total_tokens = sum(period_model_tokens.values())
-    days_count = len(set(r['date'] for r in all_data if start_date <= r['date'] <= end_date)) or 1
+    days_count = store.get_active_days(start_date, end_date) or 1
     
-    # Increase to Top 5 for Trend lines
-    top_trend_models = sorted(trend_model_tokens.keys(), key=lambda x: -trend_model_tokens[x])[:5]
+    # Increase to Top 5 for Trend lines (partial selection, no full sort)
+    top_trend_models = heapq.nlargest(5, trend_model_tokens, key=trend_model_tokens.get)
     colors = ["#10b981", "#3b82f6", "#f59e0b", "#a855f7", "#ec4899", "#06b6d4"]
 
-    def fmt_tokens(t):
-        if t >= 1000000: return f"{t/1000000:.1f}M"
-        if t >= 1000: return f"{t/1000:.1f}K"
-        return str(int(t))
-    def fmt_cost(c): return f"${c:.2f}"
-
     def get_trend_svg(dates, key, width=580, height=140):
-        max_val = max([daily_total.get(d, {}).get(key, 0) for d in dates] or [1]) or 1
-        svg = f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" style="overflow:visible;display:block">'
-        svg += f'<defs><linearGradient id="g-{key}" x1="0%" y1="0%" x2="0%" y2="100%"><stop offset="0%" style="stop-color:{colors[0]};stop-opacity:0.2"/><stop offset="100%" style="stop-color:{colors[0]};stop-opacity:0"/></linearGradient></defs>'
-        pts = [f"{(i/(len(dates)-1))*width:.1f},{height-(daily_total.get(d,{}).get(key,0)/max_val*height):.1f}" for i, d in enumerate(dates)]
+        # Dates are pre-filled, so direct indexing works and no empty-dict
+        # defaults get allocated per lookup
+        max_val = max(daily_total[d][key] for d in dates) or 1
+        # x coordinates are the same for every series; format them once
+        x_step = width / (len(dates) - 1)
+        x_coords = [f"{i * x_step:.1f}" for i in range(len(dates))]
+        parts = [f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" style="overflow:visible;display:block">',
+                 f'<defs><linearGradient id="g-{key}" x1="0%" y1="0%" x2="0%" y2="100%"><stop offset="0%" style="stop-color:{colors[0]};stop-opacity:0.2"/><stop offset="100%" style="stop-color:{colors[0]};stop-opacity:0"/></linearGradient></defs>']
+        pts = [f"{x},{height-(daily_total[d][key]/max_val*height):.1f}" for x, d in zip(x_coords, dates)]
         path = "L".join(pts)
-        svg += f'<path d="M{path} L{width},{height} L0,{height} Z" fill="url(#g-{key})" /><path d="M{path}" fill="none" stroke="{colors[0]}" stroke-width="3" />'
+        parts.append(f'<path d="M{path} L{width},{height} L0,{height} Z" fill="url(#g-{key})" /><path d="M{path}" fill="none" stroke="{colors[0]}" stroke-width="3" />')
         for idx, m in enumerate(top_trend_models):
-            m_pts = [f"{(i/(len(dates)-1))*width:.1f},{height-(daily_models.get(d,{}).get(m,{}).get(key,0)/max_val*height):.1f}" for i, d in enumerate(dates)]
-            svg += f'<path d="M{"L".join(m_pts)}" fill="none" stroke="{colors[(idx+1)%len(colors)]}" stroke-width="1.2" stroke-dasharray="3,2" opacity="0.7" />'
-        return svg + '</svg>'
+            m_pts = [f"{x},{height-(daily_models[d].get(m, zero_day)[key]/max_val*height):.1f}" for x, d in zip(x_coords, dates)]
+            parts.append(f'<path d="M{"L".join(m_pts)}" fill="none" stroke="{colors[(idx+1)%len(colors)]}" stroke-width="1.2" stroke-dasharray="3,2" opacity="0.7" />')
+        parts.append('</svg>')
+        return ''.join(parts)
 
-    last_7_dates = [(today_dt - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(6, -1, -1)]
+    # Bar labels precomputed alongside the dates; avoids strptime per bar
+    last_7_dates = last_30_dates[-7:]
+    last_7_labels = [f"{d[5:7]}/{d[8:10]}" for d in last_7_dates]
     avg_unit_cost = (total_cost / total_tokens * 1000000) if total_tokens > 0 else 0
     daily_avg_cost = (total_cost / days_count) if days_count > 0 else 0
     
@@ -117,12 +184,9 @@ def generate_html_report(
         symbol = "↑" if growth_pct_val > 0 else "↓"
         growth_html = f'<span style="background:rgba(0,0,0,0.25);color:{color};padding:2px 10px;border-radius:100px;font-size:14px;margin-left:12px;font-weight:700;display:inline-flex;align-items:center">{symbol}{abs(growth_pct_val):.1f}%</span>'
 
-    def clean_m(m):
-        for k in ['MiniMax', 'Claude', 'Gemini', 'GPT']:
-            if k.lower() in m.lower(): return k
-        return (m[:10]+'..') if len(m)>10 else m
-
-    html = f"""<!DOCTYPE html>
+    # Accumulate fragments and join once; avoids quadratic string growth
+    parts = []
+    parts.append(f"""<!DOCTYPE html>
 <html>
 <head><meta charset="UTF-8"><title>{title}</title></head>
 <body style="margin:0;padding:0;font-family:-apple-system,sans-serif;background:#0d0d0d;color:#fff">
@@ -142,21 +206,19 @@ def generate_html_report(
             <div style="background:#1a1a1a;border-radius:24px;padding:28px;border:1px solid #2a2a2a;flex-grow:1;display:flex;flex-direction:column">
                 <div style="font-size:16px;font-weight:700;margin-bottom:20px;color:#10b981">Model Efficiency (Period)</div>
                 <div style="flex-grow:1">
-                """
-    
+                """)
+
     # Efficiency list: models used in CURRENT PERIOD
-    sorted_period_models = sorted(period_model_tokens.keys(), key=lambda x: -period_model_tokens[x])
-    for m in sorted_period_models[:6]:
+    top_period_models = heapq.nlargest(6, period_model_tokens, key=period_model_tokens.get)
+    for m in top_period_models:
         tokens = period_model_tokens[m]
         cost = period_model_cost[m]
         pct = (tokens / total_tokens * 100) if total_tokens > 0 else 0
         u_cost = (cost / tokens * 1000000) if tokens > 0 else 0
-        html += f"""<div style="margin-bottom:24px">
-                <div style="display:flex;justify-content:space-between;margin-bottom:8px;font-size:13px"><span style="color:#10b981;font-weight:600">{m[:18]}</span><span>{fmt_tokens(tokens)}</span></div>
-                <div style="height:6px;background:#2a2a2a;border-radius:3px;overflow:hidden;margin-bottom:6px"><div style="height:100%;width:{pct:.1f}%;background:#10b981"></div></div>
-                <div style="font-size:10px;color:#6b7280;display:flex;justify-content:space-between"><span>Unit Cost: ${u_cost:.2f}/M</span><span>Cost: {fmt_cost(cost)}</span></div></div>"""
+        parts.append(_MODEL_ROW_TPL.format(name=m[:18], tokens=fmt_tokens(tokens),
+                                           pct=pct, u_cost=u_cost, cost=fmt_cost(cost)))
     
-    html += f"""
+    parts.append(f"""
                 </div>
             </div>
 
@@ -172,20 +234,18 @@ def generate_html_report(
             <div style="background:#1a1a1a;border-radius:24px;padding:32px;border:1px solid #2a2a2a">
                 <div style="font-size:18px;font-weight:700;margin-bottom:24px;color:#10b981">Last 7 Days Activity</div>
                 <div style="display:flex;gap:12px;align-items:flex-end;height:140px;padding-top:20px">
-                """
+                """)
+
     
-    max_day_tok = max([daily_total.get(d,{}).get('tokens',0) for d in last_7_dates] or [1]) or 1
-    for d in last_7_dates:
-        tokens = daily_total.get(d,{}).get('tokens',0)
+    # One pass over daily_total for the week; the bar loop reuses the values
+    last_7_tokens = [daily_total[d]['tokens'] for d in last_7_dates]
+    max_day_tok = max(last_7_tokens) or 1
+    for label, tokens in zip(last_7_labels, last_7_tokens):
         h_pct = (tokens / max_day_tok * 100)
-        label = datetime.strptime(d,"%Y-%m-%d").strftime("%m/%d")
-        html += f"""<div style="flex:1;display:flex;flex-direction:column;align-items:center;gap:10px">
-                    <div style="font-size:10px;color:#10b981;font-weight:600">{fmt_tokens(tokens) if tokens>0 else ''}</div>
-                    <div style="width:100%;background:#2a2a2a;border-radius:8px;height:120px;position:relative;overflow:hidden">
-                    <div style="position:absolute;bottom:0;width:100%;height:{h_pct:.1f}%;background:linear-gradient(0deg,#059669,#10b981);border-radius:4px"></div></div>
-                    <span style="font-size:11px;color:#6b7280">{label}</span></div>"""
+        parts.append(_DAY_BAR_TPL.format(tokens_label=fmt_tokens(tokens) if tokens > 0 else '',
+                                         h_pct=h_pct, label=label))
                     
-    html += f"""
+    parts.append(f"""
                 </div>
             </div>
 
@@ -198,11 +258,11 @@ def generate_html_report(
                     </div>
                 </div>
                 <div style="margin-bottom:40px;flex-grow:1">
-                    <div style="display:flex;justify-content:space-between;font-size:11px;color:#6b7280;margin-bottom:12px"><span>Token Trends</span><span>Peak: {fmt_tokens(max([daily_total.get(d,{}).get('tokens',0) for d in last_30_dates] or [0]))}</span></div>
+                    <div style="display:flex;justify-content:space-between;font-size:11px;color:#6b7280;margin-bottom:12px"><span>Token Trends</span><span>Peak: {fmt_tokens(max(daily_total[d]['tokens'] for d in last_30_dates))}</span></div>
                     {get_trend_svg(last_30_dates, 'tokens', width=620, height=140)}
                 </div>
                 <div style="flex-grow:1">
-                    <div style="display:flex;justify-content:space-between;font-size:11px;color:#6b7280;margin-bottom:12px"><span>Cost Trends (USD)</span><span>Peak: {fmt_cost(max([daily_total.get(d,{}).get('cost',0) for d in last_30_dates] or [0]))}</span></div>
+                    <div style="display:flex;justify-content:space-between;font-size:11px;color:#6b7280;margin-bottom:12px"><span>Cost Trends (USD)</span><span>Peak: {fmt_cost(max(daily_total[d]['cost'] for d in last_30_dates))}</span></div>
                     {get_trend_svg(last_30_dates, 'cost', width=620, height=140)}
                 </div>
             </div>
@@ -210,7 +270,26 @@ def generate_html_report(
     </div>
 </body>
 </html>
-"""
+""")
+    html = ''.join(parts)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Drop superseded renders of this report (same tag, older data
+        # version) and entries the moving date windows left behind
+        cutoff = datetime.now().timestamp() - 7 * 86400
+        for name in os.listdir(cache_dir):
+            if not name.startswith("llm-cost-report.") or name == cache_name:
+                continue
+            path = os.path.join(cache_dir, name)
+            try:
+                if name.startswith(f"llm-cost-report.{cache_tag}-") or os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            f.write(html)
+    except OSError:
+        pass  # cache is best-effort
     return html
 
 
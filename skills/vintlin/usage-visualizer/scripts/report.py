@@ -8,6 +8,7 @@ import os
 import sys
 import yaml
 from datetime import datetime, timedelta
+from operator import itemgetter
 from typing import Dict
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -92,17 +93,21 @@ def print_report(period: str, config: Dict):
     
     start_date, end_date = get_date_range(period)
     
-    # Get data
-    total_cost = store.get_total_cost(start_date, end_date)
-    by_provider = store.get_cost_by_provider(start_date, end_date)
-    by_model = store.get_cost_by_model(start_date, end_date)
-    tokens_summary = store.get_tokens_summary(start_date, end_date)
+    # Get data (all four aggregates over one connection)
+    bundle = store.get_report_bundle(start_date, end_date)
+    total_cost = bundle["total_cost"]
+    by_provider = bundle["by_provider"]
+    by_model = bundle["by_model"]
+    tokens_summary = bundle["tokens"]
     budget_limit = config.get("budget", {}).get("monthly_limit", 0)
     
     # Cache savings
     cache_savings = calc_cache_savings(tokens_summary)
     
     date_label = {"today": "Today", "yesterday": "Yesterday", "week": "This Week", "month": "This Month"}.get(period, period)
+
+    # Precompute the percentage factor once instead of branching per row
+    pct_factor = (100.0 / total_cost) if total_cost > 0 else 0.0
     
     print(f"\n💰 LLM Cost Report - {date_label}")
     print("=" * 50)
@@ -123,15 +128,15 @@ def print_report(period: str, config: Dict):
     # By provider
     if by_provider:
         print(f"\n📊 By Provider:")
-        for provider, cost in sorted(by_provider.items(), key=lambda x: x[1], reverse=True):
-            pct = (cost / total_cost * 100) if total_cost > 0 else 0
+        for provider, cost in sorted(by_provider.items(), key=itemgetter(1), reverse=True):
+            pct = cost * pct_factor
             print(f"  • {provider}: {fmt_cost(cost)} ({pct:.0f}%)")
     
     # By model
     if by_model:
         print(f"\n📈 By Model (Top 10):")
-        for model, cost in sorted(by_model.items(), key=lambda x: x[1], reverse=True)[:10]:
-            pct = (cost / total_cost * 100) if total_cost > 0 else 0
+        for model, cost in sorted(by_model.items(), key=itemgetter(1), reverse=True)[:10]:
+            pct = cost * pct_factor
             print(f"  • {model}: {fmt_cost(cost)} ({pct:.0f}%)")
     
     # Budget
@@ -155,10 +160,11 @@ def print_json(period: str, config: Dict):
     
     start_date, end_date = get_date_range(period)
     
-    total_cost = store.get_total_cost(start_date, end_date)
-    by_provider = store.get_cost_by_provider(start_date, end_date)
-    by_model = store.get_cost_by_model(start_date, end_date)
-    tokens_summary = store.get_tokens_summary(start_date, end_date)
+    bundle = store.get_report_bundle(start_date, end_date)
+    total_cost = bundle["total_cost"]
+    by_provider = bundle["by_provider"]
+    by_model = bundle["by_model"]
+    tokens_summary = bundle["tokens"]
     cache_savings = calc_cache_savings(tokens_summary)
     
     output = {
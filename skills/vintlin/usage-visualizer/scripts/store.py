@@ -9,6 +9,94 @@ from pathlib import Path
 from typing import Dict, List, Optional
 
 
+_INSERT_INCREMENTAL = """
+    INSERT INTO usage_records
+    (date, provider, api_key_hash, model, app, source, input_tokens, output_tokens,
+     cache_read_tokens, cache_creation_tokens, cost, savings)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(date, provider, api_key_hash, model, app, source)
+    DO UPDATE SET
+        input_tokens = usage_records.input_tokens + excluded.input_tokens,
+        output_tokens = usage_records.output_tokens + excluded.output_tokens,
+        cache_read_tokens = usage_records.cache_read_tokens + excluded.cache_read_tokens,
+        cache_creation_tokens = usage_records.cache_creation_tokens + excluded.cache_creation_tokens,
+        cost = usage_records.cost + excluded.cost,
+        savings = usage_records.savings + excluded.savings
+"""
+
+_INSERT_OVERWRITE = """
+    INSERT INTO usage_records
+    (date, provider, api_key_hash, model, app, source, input_tokens, output_tokens,
+     cache_read_tokens, cache_creation_tokens, cost, savings)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(date, provider, api_key_hash, model, app, source)
+    DO UPDATE SET
+        input_tokens = excluded.input_tokens,
+        output_tokens = excluded.output_tokens,
+        cache_read_tokens = excluded.cache_read_tokens,
+        cache_creation_tokens = excluded.cache_creation_tokens,
+        cost = excluded.cost,
+        savings = excluded.savings
+"""
+
+
+# Report aggregates, parameterized once and shared by get_report_bundle
+_REPORT_TOTAL_SQL = "SELECT SUM(cost) FROM usage_records WHERE date >= ? AND date <= ?"
+
+_REPORT_PROVIDER_SQL = """
+    SELECT provider, SUM(cost) as cost
+    FROM usage_records
+    WHERE date >= ? AND date <= ?
+    GROUP BY provider
+"""
+
+_REPORT_MODEL_SQL = """
+    SELECT model, SUM(cost) as cost
+    FROM usage_records
+    WHERE date >= ? AND date <= ?
+    GROUP BY model ORDER BY cost DESC
+"""
+
+# The three HTML-report windows in one round trip, tagged by bucket
+_REPORT_WINDOWS_SQL = """
+    SELECT 'trend' AS bucket, date, model,
+           SUM(input_tokens + output_tokens) as tokens,
+           SUM(cost) as cost,
+           SUM(savings) as savings
+    FROM usage_records
+    WHERE date >= ? AND date <= ?
+    GROUP BY date, model
+    UNION ALL
+    SELECT 'period', '', model,
+           SUM(input_tokens + output_tokens),
+           SUM(cost),
+           SUM(savings)
+    FROM usage_records
+    WHERE date >= ? AND date <= ?
+    GROUP BY model
+    UNION ALL
+    SELECT 'prev', '', model,
+           SUM(input_tokens + output_tokens),
+           SUM(cost),
+           SUM(savings)
+    FROM usage_records
+    WHERE date >= ? AND date <= ?
+    GROUP BY model
+"""
+
+_REPORT_TOKENS_SQL = """
+    SELECT
+        SUM(input_tokens) as total_input,
+        SUM(output_tokens) as total_output,
+        SUM(cache_read_tokens) as total_cache_read,
+        SUM(cache_creation_tokens) as total_cache_write,
+        SUM(input_tokens + output_tokens) as total_tokens,
+        SUM(cost) as total_cost
+    FROM usage_records
+    WHERE date >= ? AND date <= ?
+"""
+
+
 class UsageStore:
     def __init__(self, storage_path: str = "~/.llm-cost-monitor"):
         self.storage_path = os.path.expanduser(storage_path)
@@ -73,44 +161,34 @@ class UsageStore:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
-        if incremental:
-            # Add to existing (default behavior)
-            cursor.execute("""
-                INSERT INTO usage_records
-                (date, provider, api_key_hash, model, app, source, input_tokens, output_tokens,
-                 cache_read_tokens, cache_creation_tokens, cost, savings)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(date, provider, api_key_hash, model, app, source)
-                DO UPDATE SET
-                    input_tokens = usage_records.input_tokens + excluded.input_tokens,
-                    output_tokens = usage_records.output_tokens + excluded.output_tokens,
-                    cache_read_tokens = usage_records.cache_read_tokens + excluded.cache_read_tokens,
-                    cache_creation_tokens = usage_records.cache_creation_tokens + excluded.cache_creation_tokens,
-                    cost = usage_records.cost + excluded.cost,
-                    savings = usage_records.savings + excluded.savings
-            """, (date, provider, key_hash, model, app, source, input_tokens, output_tokens,
-                  cache_read_tokens, cache_creation_tokens, cost, savings))
-        else:
-            # Overwrite (for full syncs where we aggregate everything first)
-            cursor.execute("""
-                INSERT INTO usage_records
-                (date, provider, api_key_hash, model, app, source, input_tokens, output_tokens,
-                 cache_read_tokens, cache_creation_tokens, cost, savings)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(date, provider, api_key_hash, model, app, source)
-                DO UPDATE SET
-                    input_tokens = excluded.input_tokens,
-                    output_tokens = excluded.output_tokens,
-                    cache_read_tokens = excluded.cache_read_tokens,
-                    cache_creation_tokens = excluded.cache_creation_tokens,
-                    cost = excluded.cost,
-                    savings = excluded.savings
-            """, (date, provider, key_hash, model, app, source, input_tokens, output_tokens,
-                  cache_read_tokens, cache_creation_tokens, cost, savings))
+        sql = _INSERT_INCREMENTAL if incremental else _INSERT_OVERWRITE
+        cursor.execute(sql, (date, provider, key_hash, model, app, source,
+                             input_tokens, output_tokens, cache_read_tokens,
+                             cache_creation_tokens, cost, savings))
 
         conn.commit()
         conn.close()
 
+    def add_usage_bulk(self, records: List[Dict], incremental: bool = True):
+        """Add many usage records in a single transaction (one executemany)"""
+        if not records:
+            return
+
+        rows = [
+            (r["date"], r["provider"], self._hash_key(r.get("api_key", "")),
+             r["model"], r.get("app", "openclaw"), r.get("source", "session"),
+             r.get("input_tokens", 0), r.get("output_tokens", 0),
+             r.get("cache_read_tokens", 0), r.get("cache_creation_tokens", 0),
+             r.get("cost", 0.0), r.get("savings", 0.0))
+            for r in records
+        ]
+
+        sql = _INSERT_INCREMENTAL if incremental else _INSERT_OVERWRITE
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany(sql, rows)
+        conn.commit()
+        conn.close()
+
     def clear_records(self, date: Optional[str] = None, source: Optional[str] = None):
         """Clear records for a specific date or source"""
         conn = sqlite3.connect(self.db_path)
@@ -353,6 +431,51 @@ class UsageStore:
             "total_cost": 0
         }
 
+    def get_active_days(
+        self,
+        start_date: str,
+        end_date: str
+    ) -> int:
+        """Count distinct dates with usage in a date range"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute(
+            "SELECT COUNT(DISTINCT date) FROM usage_records WHERE date >= ? AND date <= ?",
+            [start_date, end_date]
+        )
+        result = cursor.fetchone()[0]
+        conn.close()
+
+        return result or 0
+
+    def get_period_summary(
+        self,
+        start_date: str,
+        end_date: str
+    ) -> Dict:
+        """Get period totals plus per-model (cost, tokens) in one query"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT model,
+                   SUM(cost) as cost,
+                   SUM(input_tokens + output_tokens) as tokens
+            FROM usage_records
+            WHERE date >= ? AND date <= ?
+            GROUP BY model
+        """, [start_date, end_date])
+        rows = cursor.fetchall()
+        conn.close()
+
+        by_model = {row[0]: (row[1] or 0.0, row[2] or 0) for row in rows}
+        return {
+            "total_cost": sum(c for c, _ in by_model.values()),
+            "total_tokens": sum(t for _, t in by_model.values()),
+            "by_model": by_model
+        }
+
     def get_daily_summary(
         self,
         start_date: str,
@@ -388,6 +511,93 @@ class UsageStore:
 
         return [dict(row) for row in rows]
 
+    def get_report_windows(
+        self,
+        trend_start: str,
+        period_start: str,
+        period_end: str,
+        prev_start: str,
+        prev_end: str
+    ) -> Dict:
+        """Aggregate the trend, requested and previous report windows at once.
+
+        One UNION ALL query instead of three round trips; rows are
+        dispatched by their bucket tag. Returns {"trend": per-day,
+        per-model rows, "period"/"prev": {model: {tokens, cost, savings}}}.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute(_REPORT_WINDOWS_SQL,
+                       [trend_start, period_end,
+                        period_start, period_end,
+                        prev_start, prev_end])
+        rows = cursor.fetchall()
+        conn.close()
+
+        trend = []
+        period = {}
+        prev = {}
+        for bucket, date, model, tokens, cost, savings in rows:
+            if bucket == 'trend':
+                trend.append({"date": date, "model": model, "tokens": tokens,
+                              "cost": cost, "savings": savings})
+            elif bucket == 'period':
+                period[model] = {"tokens": tokens, "cost": cost, "savings": savings}
+            else:
+                prev[model] = {"tokens": tokens, "cost": cost, "savings": savings}
+
+        return {"trend": trend, "period": period, "prev": prev}
+
+    def get_data_version(self, start_date: str, end_date: str) -> str:
+        """Cheap fingerprint of the rows in a date range (max rowid + count)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        # SUM(cost) catches in-place upserts that leave rowid/count unchanged
+        cursor.execute(
+            "SELECT MAX(rowid), COUNT(*), SUM(cost) FROM usage_records WHERE date >= ? AND date <= ?",
+            [start_date, end_date]
+        )
+        row = cursor.fetchone()
+        conn.close()
+
+        return f"{row[0] or 0}-{row[1]}-{row[2] or 0:.6f}"
+
+    def get_report_bundle(self, start_date: str, end_date: str) -> Dict:
+        """Run all report aggregates over a single connection.
+
+        Returns {"total_cost", "by_provider", "by_model", "tokens"} — the
+        same data as get_total_cost, get_cost_by_provider, get_cost_by_model
+        and get_tokens_summary, without four connect/parse round trips.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        params = (start_date, end_date)
+
+        total_cost = cursor.execute(_REPORT_TOTAL_SQL, params).fetchone()[0] or 0.0
+        by_provider = {r[0]: r[1] for r in cursor.execute(_REPORT_PROVIDER_SQL, params)}
+        by_model = {r[0]: r[1] for r in cursor.execute(_REPORT_MODEL_SQL, params)}
+
+        row = cursor.execute(_REPORT_TOKENS_SQL, params).fetchone()
+        tokens = {
+            "input_tokens": row[0] or 0,
+            "output_tokens": row[1] or 0,
+            "cache_read_tokens": row[2] or 0,
+            "cache_creation_tokens": row[3] or 0,
+            "total_tokens": row[4] or 0,
+            "total_cost": row[5] or 0
+        }
+
+        conn.close()
+
+        return {
+            "total_cost": total_cost,
+            "by_provider": by_provider,
+            "by_model": by_model,
+            "tokens": tokens
+        }
+
     @staticmethod
     def _hash_key(api_key: str) -> str:
         """Hash API key for storage"""